@@ -0,0 +1,60 @@
+"""
+Converts GeM bid search documents into rows for the bids table.
+
+This is the per-document hot path of scrape_bids.db_worker. It has no
+project imports, so it can be compiled in place when the DB worker becomes
+CPU-bound:
+
+    pip install mypyc && mypyc convert.py
+
+The compiled extension shadows this file on `import convert`. Without it
+the plain module is used as is.
+"""
+
+# Bid document fields in INSERT column order, with the value used when missing
+BID_FIELDS = (
+    ("b_id", 0),
+    ("b_bid_number", ""),
+    ("b_category_name", ""),
+    ("b_cat_id", ""),
+    ("b_total_quantity", 0),
+    ("b_status", 0),
+    ("b_type", 0),
+    ("final_start_date_sort", None),
+    ("final_end_date_sort", None),
+    ("bd_category_name", ""),
+    ("b_eval_type", 0),
+    ("ba_official_details_minName", ""),
+    ("ba_official_details_deptName", ""),
+)
+
+def doc_to_row(doc: dict) -> tuple:
+    """Unwraps a Solr bid doc (most fields are single-element lists) into an upsert row."""
+    _get = doc.get
+    vals = []
+    for key, default in BID_FIELDS:
+        val = _get(key)
+        if isinstance(val, list):
+            val = val[0] if val else default
+        elif val is None:
+            val = default
+        vals.append(val)
+
+    if not vals[0]:
+        vals[0] = int(doc["id"])
+    return tuple(vals)
+
+# Characters that must be backslash-escaped in COPY text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def row_to_copy_line(row: tuple) -> str:
+    """Formats a row as one line of COPY text input (tab-separated, \\N for NULL)."""
+    fields = []
+    for val in row:
+        if val is None:
+            fields.append("\\N")
+        elif isinstance(val, str):
+            fields.append(val.translate(COPY_ESCAPES))
+        else:
+            fields.append(str(val))
+    return "\t".join(fields) + "\n"
@@ -1,5 +1,6 @@
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import psycopg2
 from psycopg2.extras import Json
 import os
@@ -7,12 +8,16 @@ import subprocess
 import sys
 from dotenv import load_dotenv
 from datetime import datetime
+from collections import deque
 import time
-import concurrent.futures
 import queue
 import threading
 import argparse
 import random
+import mmap
+import io
+
+from convert import doc_to_row, row_to_copy_line
 
 # Load env variables
 load_dotenv()
@@ -24,25 +29,52 @@ DB_NAME = os.getenv("DB_NAME", "localtoastd")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "kali")
 
-# Global Queue for Producer-Consumer
+# Global Queue for Producer-Consumer (bounded in main() once the worker count is known)
 data_queue = queue.Queue()
 # Event to signal "done fetching"
 done_event = threading.Event()
 DEBUG_MODE = False
 
-# Error handling globals
-ERRORS_FILE = "errors.txt"
-error_file_lock = threading.Lock()
-
-# Skip list / Redundancy globals
-DUPLICATE_PAGES_FILE = "duplicate_pages.txt"
-duplicate_file_lock = threading.Lock()
+# Event log globals (failed pages and redundant pages)
+# One append-only log with a type prefix per line: "E <page>" for a page dropped
+# after retries, "D <page>" for a page whose records were all already saved.
+# Producers only enqueue; a single writer thread batches the writes.
+EVENTS_FILE = "events.log"
+EVENT_ERROR = b"E"
+EVENT_DUPLICATE = b"D"
+EVENT_BATCH_SIZE = 100
+EVENT_FLUSH_INTERVAL = 0.5 # seconds
+# Per-kind page lists written by older versions; imported into the event log once
+LEGACY_EVENT_FILES = (("errors.txt", EVENT_ERROR), ("duplicate_pages.txt", EVENT_DUPLICATE))
+event_queue = queue.SimpleQueue()
 
 # Progress tracking globals
-PROGRESS_FILE = "progress.txt"
-progress_file_lock = threading.Lock()
+# Bitmap of saved pages: bit (p & 7) of byte (p >> 3) is set once page p's rows are committed.
+# Only the DB worker writes the bitmap and only the event loop touches the counter, so neither needs a lock
+PROGRESS_FILE = "progress.bin"
+progress_map = None
 pages_fetched_counter = 0
-pages_fetched_lock = threading.Lock()
+
+BIDS_DATA_URL = "https://bidplus.gem.gov.in/all-bids-data"
+# Shared async client, built in main() once the worker count is known
+http_client = None
+
+# With HTTP/2 the worker tasks multiplex their POSTs as streams over a few TLS
+# connections. If the server falls back to HTTP/1.1, every in-flight request needs its
+# own connection, so the pool gets one slot per worker to keep -w meaningful either way.
+# Waiting for a slot has no timeout (pool=None) so queueing is never counted as a failed page.
+# The transport retries failed connection attempts itself; HTTP-level failures
+# go back to the page queue so the retry can use a different cookie set.
+def make_http_client(max_workers):
+    """Builds the shared HTTP/2 client with one connection slot per fetch worker."""
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers),
+            retries=2
+        ),
+        timeout=httpx.Timeout(30, pool=None)
+    )
 
 COOKIE_POOL = [
     {
@@ -135,6 +167,71 @@ COOKIE_POOL = [
     },
 ]
 
+# Request headers never change per cookie set, so build them once
+BASE_HEADERS = {
+    "accept": "application/json, text/javascript, */*; q=0.01",
+    "accept-language": "en-US,en;q=0.9",
+    "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "X-Requested-With": "XMLHttpRequest",
+    "origin": "https://bidplus.gem.gov.in",
+    "referer": "https://bidplus.gem.gov.in/all-bids",
+}
+COOKIE_HEADERS = {c["csrf_bd_gem_nk"]: {**BASE_HEADERS, "cookie": c["cookie"]} for c in COOKIE_POOL}
+
+# search_vector is computed by Postgres from the stored text columns on write
+SEARCH_VECTOR_EXPR = """to_tsvector('english',
+        coalesce(b_category_name, '') || ' ' || coalesce(bd_category_name, '') || ' ' ||
+        coalesce(b_cat_id, '') || ' ' || coalesce(ministry_name, '') || ' ' ||
+        coalesce(department_name, '') || ' ' || coalesce(b_bid_number, ''))"""
+
+# Per-cookie cool-down after rate limiting, keyed by CSRF token:
+# earliest time the cookie may be used again and its consecutive rate-limit count.
+# Only the event loop touches these, so no lock is needed.
+RATE_LIMIT_STATUSES = (429, 503)
+cookie_next_ready = {c["csrf_bd_gem_nk"]: 0.0 for c in COOKIE_POOL}
+cookie_strikes = {c["csrf_bd_gem_nk"]: 0 for c in COOKIE_POOL}
+
+async def acquire_cookie(preferred_index):
+    """Returns the preferred cookie set if it is ready, else the soonest-ready one, waiting if none is."""
+    while True:
+        now = time.time()
+        cookie_set = COOKIE_POOL[preferred_index]
+        if cookie_next_ready[cookie_set["csrf_bd_gem_nk"]] > now:
+            cookie_set = min(COOKIE_POOL, key=lambda c: cookie_next_ready[c["csrf_bd_gem_nk"]])
+        wait = cookie_next_ready[cookie_set["csrf_bd_gem_nk"]] - now
+        if wait <= 0:
+            return cookie_set
+        await asyncio.sleep(wait)
+
+def cool_down_cookie(cookie_set):
+    """Backs a rate-limited cookie off with jittered exponential delay."""
+    token = cookie_set["csrf_bd_gem_nk"]
+    strikes = cookie_strikes[token]
+    cookie_strikes[token] = strikes + 1
+    cookie_next_ready[token] = time.time() + random.uniform(0.5, 1.5) * 2 ** min(strikes, 6)
+
+# Batches are streamed with COPY into a per-connection staging table, then
+# upserted in one statement; b_id comes back with the insert flag so each page
+# in a batch can still be checked for redundancy
+BID_COLUMNS = """b_id, b_bid_number, b_category_name, b_cat_id, b_total_quantity, b_status, b_type,
+    final_start_date_sort, final_end_date_sort, bd_category_name, b_eval_type,
+    ministry_name, department_name"""
+CREATE_BIDS_STAGE = f"""
+CREATE TEMP TABLE IF NOT EXISTS bids_stage ON COMMIT DELETE ROWS AS
+SELECT {BID_COLUMNS} FROM bids WITH NO DATA
+"""
+COPY_BIDS_STAGE = f"COPY bids_stage ({BID_COLUMNS}) FROM STDIN"
+BIDS_UPSERT_FROM_STAGE = f"""
+INSERT INTO bids ({BID_COLUMNS})
+SELECT {BID_COLUMNS} FROM bids_stage
+ON CONFLICT (b_id) DO UPDATE SET
+    b_status = EXCLUDED.b_status,
+    final_end_date_sort = EXCLUDED.final_end_date_sort
+RETURNING b_id, (xmax = 0) AS is_insert
+"""
+DB_BATCH_ROWS = 10000 # rows drained from the queue per upsert
+
 def create_database_if_not_exists():
     """Creates the database if it doesn't exist."""
     try:
@@ -197,8 +294,20 @@ def init_db(conn, reset=False):
             print("[INFO] Old schema detected. Recreating table 'bids'...")
             cur.execute("DROP TABLE bids")
             conn.commit()
-
-    create_table_query = """
+        else:
+            # Tables created before search_vector became a generated column
+            cur.execute("""
+            SELECT is_generated FROM information_schema.columns
+            WHERE table_name='bids' AND column_name='search_vector';
+            """)
+            row = cur.fetchone()
+            if row and row[0] == 'NEVER':
+                print("[INFO] Converting 'search_vector' to a generated column...")
+                cur.execute("ALTER TABLE bids DROP COLUMN search_vector")
+                cur.execute(f"ALTER TABLE bids ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPR}) STORED")
+                conn.commit()
+
+    create_table_query = f"""
     CREATE TABLE IF NOT EXISTS bids (
         b_id BIGINT PRIMARY KEY,
         b_bid_number TEXT,
@@ -213,7 +322,7 @@ def init_db(conn, reset=False):
         b_eval_type INT,
         ministry_name TEXT,
         department_name TEXT,
-        search_vector TSVECTOR,
+        search_vector TSVECTOR GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPR}) STORED,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     
@@ -223,20 +332,97 @@ def init_db(conn, reset=False):
     conn.commit()
     cur.close()
 
-def fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set, retries=3):
-    """Fetches a single page of bid data. Runs in a worker thread."""
-    url = "https://bidplus.gem.gov.in/all-bids-data"
-    
-    headers = {
-        "accept": "application/json, text/javascript, */*; q=0.01",
-        "accept-language": "en-US,en;q=0.9",
-        "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "X-Requested-With": "XMLHttpRequest",
-        "origin": "https://bidplus.gem.gov.in",
-        "referer": "https://bidplus.gem.gov.in/all-bids",
-        "cookie": cookie_set["cookie"]
-    }
+def open_progress_map(max_page):
+    """Memory-maps the progress bitmap, growing the file to hold max_page."""
+    size = (max_page >> 3) + 1
+    fd = os.open(PROGRESS_FILE, os.O_RDWR | os.O_CREAT)
+    try:
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        return mmap.mmap(fd, 0)
+    finally:
+        os.close(fd)
+
+def mark_page_done(page_num):
+    """Sets the progress bit for page_num once its rows are committed. Called from the DB worker only."""
+    # Page 1 comes from the initial fetch, before the map exists; resume never skips it anyway
+    if progress_map is not None and (page_num >> 3) < len(progress_map):
+        progress_map[page_num >> 3] |= 1 << (page_num & 7)
+
+def count_done_pages():
+    """Counts the pages recorded in the progress bitmap."""
+    with open(PROGRESS_FILE, 'rb') as f:
+        return sum(bin(b).count("1") for b in f.read())
+
+def log_event(kind, page_num):
+    """Queues an event line for the writer thread."""
+    event_queue.put(b"%s %d\n" % (kind, page_num))
+
+def event_writer():
+    """Writer thread: appends queued events in batches until it receives None."""
+    fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0))
+    buf = bytearray()
+    pending = 0
+    last_write = time.time()
+    stopping = False
+    while not stopping:
+        try:
+            line = event_queue.get(timeout=EVENT_FLUSH_INTERVAL)
+            if line is None:
+                stopping = True
+            else:
+                buf += line
+                pending += 1
+        except queue.Empty:
+            pass
+
+        if buf and (stopping or pending >= EVENT_BATCH_SIZE or time.time() - last_write >= EVENT_FLUSH_INTERVAL):
+            try:
+                os.write(fd, buf)
+            except OSError as e:
+                print(f"[ERROR] Could not write to {EVENTS_FILE}: {e}")
+            buf.clear()
+            pending = 0
+            last_write = time.time()
+
+    os.fsync(fd)
+    os.close(fd)
+
+def read_event_pages(kind, remove=False):
+    """Returns the pages logged with the given event kind, optionally dropping them from the log."""
+    if not os.path.exists(EVENTS_FILE):
+        return []
+    with open(EVENTS_FILE, 'rb') as f:
+        lines = f.read().splitlines()
+
+    pages, kept = [], []
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == kind and parts[1].isdigit():
+            pages.append(int(parts[1]))
+        elif line:
+            kept.append(line + b"\n")
+
+    if remove:
+        with open(EVENTS_FILE, 'wb') as f:
+            f.writelines(kept)
+    return pages
+
+def import_legacy_event_files():
+    """Appends pages from old per-kind files to the event log as typed lines, then renames each file aside."""
+    for path, kind in LEGACY_EVENT_FILES:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            pages = [line.strip() for line in f if line.strip().isdigit()]
+        with open(EVENTS_FILE, 'ab') as f:
+            f.writelines(kind + b" " + page + b"\n" for page in pages)
+        os.replace(path, path + ".migrated")
+        print(f"[INFO] Imported {len(pages)} pages from '{path}' into '{EVENTS_FILE}' (renamed to '{path}.migrated').")
+
+async def fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set):
+    """Fetches a single page of bid data once. Runs in a worker task; retries go through the page queue."""
+    headers = COOKIE_HEADERS[cookie_set["csrf_bd_gem_nk"]]
 
     payload_dict = {
         "page": page_num,
@@ -254,7 +440,7 @@ def fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set, retrie
         }
     }
     
-    data = {"payload": json.dumps(payload_dict)}
+    data = {"payload": orjson.dumps(payload_dict).decode()}
     data["csrf_bd_gem_nk"] = cookie_set["csrf_bd_gem_nk"] 
 
     # print(f"[DEBUG] Fetching Page {page_num}...") 
@@ -262,40 +448,67 @@ def fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set, retrie
         print(f"[DEBUG] Fetching Page {page_num}...")
 
     # Add 200ms delay before each request
-    time.sleep(0.2)
-
-    for attempt in range(retries):
-        try:
-            response = requests.post(url, headers=headers, data=data, timeout=30)
-            response.raise_for_status()
-            
-            json_data = response.json()
-            if json_data and "response" in json_data and "response" in json_data["response"] and "docs" in json_data["response"]["response"]:
-                docs = json_data["response"]["response"]["docs"]
-                # Put results into generic queue as (page_num, docs) tuple
-                data_queue.put((page_num, docs))
-                print(f"[INFO] Page {page_num} fetched ({len(docs)} items)")
-                return True
-            else:
-                if attempt == retries - 1:
-                    print(f"[WARN] Empty/invalid response for Page {page_num}")
-                return False
-        except Exception as e:
-            if attempt < retries - 1:
-                time.sleep(1 + attempt) # Backoff
-            else:
-                csrf_token = cookie_set.get("csrf_bd_gem_nk", "unknown")
-                print(f"[Error] Failed Page {page_num} (CSRF: {csrf_token}): {e}")
-                return False
+    await asyncio.sleep(0.2)
 
-def db_worker():
-    """Consumer thread: reads from queue and saves to DB."""
     try:
-        conn = get_db_connection()
+        response = await http_client.post(BIDS_DATA_URL, headers=headers, data=data)
+        response.raise_for_status()
+        
+        # Rate-limit and error pages come back as HTML; reject anything that is
+        # not a JSON object before paying for a full parse.
+        body = response.content
+        if not body.startswith(b"{"):
+            raise ValueError(f"Unexpected response body: {body[:64]!r}")
+        json_data = orjson.loads(body)
+        if json_data and "response" in json_data and "response" in json_data["response"] and "docs" in json_data["response"]["response"]:
+            docs = json_data["response"]["response"]["docs"]
+            cookie_strikes[cookie_set["csrf_bd_gem_nk"]] = 0
+            # Put results into generic queue as (page_num, docs) tuple.
+            # When the DB worker is behind, wait for room off the event loop.
+            try:
+                data_queue.put_nowait((page_num, docs))
+            except queue.Full:
+                await asyncio.to_thread(data_queue.put, (page_num, docs))
+            print(f"[INFO] Page {page_num} fetched ({len(docs)} items)")
+            return True
+        else:
+            print(f"[WARN] Empty/invalid response for Page {page_num}")
+            return False
     except Exception as e:
-        print(f"[FATAL] DB Worker failed to connect: {e}")
-        return
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in RATE_LIMIT_STATUSES:
+            cool_down_cookie(cookie_set)
+        csrf_token = cookie_set.get("csrf_bd_gem_nk", "unknown")
+        print(f"[Error] Failed Page {page_num} (CSRF: {csrf_token}): {e}")
+        return False
+
+def upsert_rows(cur, conn, rows):
+    """COPYs rows into bids_stage and upserts them in one transaction. Returns the newly inserted b_ids."""
+    buf = io.StringIO()
+    buf.writelines(map(row_to_copy_line, rows))
+    buf.seek(0)
+    cur.copy_expert(COPY_BIDS_STAGE, buf)
+    cur.execute(BIDS_UPSERT_FROM_STAGE)
+    result = cur.fetchall()
+    conn.commit()
+    return {b_id for b_id, is_insert in result if is_insert}
 
+def save_rows(cur, conn, rows, saved, inserted):
+    """Upserts rows, adding their b_ids to saved/inserted. A failed batch is split in
+    halves and retried, so only the rows that fail on their own are dropped."""
+    try:
+        inserted |= upsert_rows(cur, conn, rows)
+        saved.update(row[0] for row in rows)
+    except Exception as e:
+        conn.rollback()
+        if len(rows) == 1:
+            print(f"[ERROR] Skipping bid {rows[0][0]}: {e}")
+            return
+        mid = len(rows) // 2
+        save_rows(cur, conn, rows[:mid], saved, inserted)
+        save_rows(cur, conn, rows[mid:], saved, inserted)
+
+def db_worker(conn):
+    """Consumer thread: reads from queue and saves to DB. Owns conn (with bids_stage created) and closes it when done."""
     cur = conn.cursor()
     global total_fetched
     total_fetched = 0
@@ -303,98 +516,66 @@ def db_worker():
     while True:
         try:
             # Block for 2 seconds waiting for item, then check done_event
-            item = data_queue.get(timeout=2)
-            # Support both new format and potentially legacy if mixed usage (unlikely here but good practice)
-            if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], list):
-                page_num, docs = item
-            elif isinstance(item, list):
-                page_num = -1 # Unknown
-                docs = item
-            else:
-                print(f"[WARN] DB Worker received invalid Item: {type(item)}")
-                data_queue.task_done()
-                continue
-                
+            # Producers always put (page_num, docs)
+            batch = [data_queue.get(timeout=2)]
         except queue.Empty:
             if done_event.is_set():
                 break
             continue
-        
-        count = 0
-        new_records_count = 0 
-        
-        for doc in docs:
-            try:
-                def get_val(key, default=None):
-                    val = doc.get(key)
-                    if isinstance(val, list):
-                        return val[0] if val else default
-                    return val if val is not None else default
-
-                b_id = get_val("b_id", 0)
-                if not b_id:
-                    b_id = int(doc.get("id"))
-                
-                b_bid_num = get_val("b_bid_number", "")
-                b_cat = get_val("b_category_name", "")
-                bd_cat = get_val("bd_category_name", "")
-                b_cat_id = get_val("b_cat_id", "")
-                
-                qty = get_val("b_total_quantity", 0)
-                status = get_val("b_status", 0)
-                b_type = get_val("b_type", 0)
-                eval_type = get_val("b_eval_type", 0)
-                
-                start_date = get_val("final_start_date_sort")
-                end_date = get_val("final_end_date_sort")
-                
-                min_name = get_val("ba_official_details_minName", "")
-                dept_name = get_val("ba_official_details_deptName", "")
 
-                sv_text = f"{b_cat or ''} {bd_cat or ''} {b_cat_id or ''} {min_name or ''} {dept_name or ''} {b_bid_num or ''}"
-                
-                query = """
-                INSERT INTO bids (
-                    b_id, b_bid_number, b_category_name, b_cat_id, b_total_quantity, b_status, b_type,
-                    final_start_date_sort, final_end_date_sort, bd_category_name, b_eval_type,
-                    ministry_name, department_name, search_vector
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, to_tsvector('english', %s))
-                ON CONFLICT (b_id) DO UPDATE SET
-                    b_status = EXCLUDED.b_status,
-                    search_vector = EXCLUDED.search_vector,
-                    final_end_date_sort = EXCLUDED.final_end_date_sort
-                RETURNING (xmax = 0) AS is_insert;
-                """
-                cur.execute(query, (
-                    b_id, b_bid_num, b_cat, b_cat_id, qty, status, b_type,
-                    start_date, end_date, bd_cat, eval_type,
-                    min_name, dept_name, sv_text
-                ))
-                
-                is_insert = cur.fetchone()[0]
-                if is_insert:
+        # Drain whatever else is already queued into the same batch
+        batch_rows = len(batch[0][1])
+        while batch_rows < DB_BATCH_ROWS:
+            try:
+                item = data_queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            batch_rows += len(item[1])
+
+        # Pages can overlap, and one statement cannot upsert the same b_id twice,
+        # so keep the last row per b_id and remember which ids each page held
+        rows = {}
+        page_ids = []
+        for page_num, docs in batch:
+            ids = []
+            for doc in docs:
+                try:
+                    row = doc_to_row(doc)
+                except Exception as e:
+                    # print(f"Skipping doc ID {doc.get('id', 'unknown')}: {e}")
+                    continue
+                rows[row[0]] = row
+                ids.append(row[0])
+            page_ids.append((page_num, docs, ids))
+
+        saved = set()
+        inserted = set()
+        if rows:
+            save_rows(cur, conn, list(rows.values()), saved, inserted)
+            if len(saved) < len(rows):
+                print(f"[WARN] Batch upsert dropped {len(rows) - len(saved)} of {len(rows)} rows")
+
+        # Redundancy check logic: a new b_id counts for the first page that held it
+        for page_num, docs, ids in page_ids:
+            if any(b_id not in saved for b_id in ids):
+                # Some rows never reached the table; leave the page unmarked so it is re-fetched
+                log_event(EVENT_ERROR, page_num)
+                continue
+            total_fetched += len(ids)
+            mark_page_done(page_num)
+            new_records_count = 0
+            for b_id in ids:
+                if b_id in inserted:
+                    inserted.discard(b_id)
                     new_records_count += 1
-                
-                count += 1
-            except Exception as e:
-                # print(f"Skipping doc ID {doc.get('id', 'unknown')}: {e}")
-                pass
-                
-        conn.commit()
-        total_fetched += count
-        
-        # Redundancy check logic
-        if page_num != -1 and len(docs) > 0 and new_records_count == 0:
-             if DEBUG_MODE:
-                 print(f"[DEBUG] Page {page_num} is redundant (all records updated).")
-             with duplicate_file_lock:
-                 try:
-                     with open(DUPLICATE_PAGES_FILE, "a") as f:
-                         f.write(f"{page_num}\n")
-                 except Exception as e:
-                      print(f"[ERROR] Could not write to {DUPLICATE_PAGES_FILE}: {e}")
-
-        data_queue.task_done()
+            if docs and new_records_count == 0:
+                if DEBUG_MODE:
+                    print(f"[DEBUG] Page {page_num} is redundant (all records updated).")
+                log_event(EVENT_DUPLICATE, page_num)
+
+        for _ in batch:
+            data_queue.task_done()
     
     cur.close()
     conn.close()
@@ -421,7 +602,7 @@ def create_backup():
     except Exception as e:
         print(f"Backup error: {e}")
 
-def main():
+async def main():
     print("====================================")
     print("       Gem Bids Scraper v3.0        ")
     print("       (Parallel Execution)         ")
@@ -430,14 +611,14 @@ def main():
     parser = argparse.ArgumentParser(description="Gem Bids Scraper")
     parser.add_argument("-t", "--test", action="store_true", help="Run in test mode (limit to 10 pages)")
     parser.add_argument("--reset", action="store_true", help="Reset the database (drop table)")
-    parser.add_argument("-w", "--workers", type=int, default=20, help="Number of worker threads (default: 20)")
+    parser.add_argument("-w", "--workers", type=int, default=20, help="Number of concurrent fetch workers (default: 20)")
     parser.add_argument("--search", type=str, default="", help="Search keyword")
     parser.add_argument("--from_date", type=str, default="", help="From Date (dd-mm-yyyy)")
     parser.add_argument("--to_date", type=str, default="", help="To Date (dd-mm-yyyy)")
     parser.add_argument("--pages", type=int, default=None, help="Specific page limit (overrides --test)")
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--interactive", action="store_true", help="Force interactive mode")
-    parser.add_argument("--resume", action="store_true", help="Resume from progress.txt")
+    parser.add_argument("--resume", action="store_true", help="Resume from progress.bin")
     
     # Default to interactive if no args provided
     if len(sys.argv) == 1:
@@ -451,24 +632,26 @@ def main():
     # Determine mode
     rescrape_errors = False
     resume_from_progress = args.resume
+
+    try:
+        import_legacy_event_files()
+    except OSError as e:
+        print(f"[WARN] Could not import old page lists into {EVENTS_FILE}: {e}")
     
     if args.interactive:
-        # Check for error file first
-        if os.path.exists(ERRORS_FILE) and os.path.getsize(ERRORS_FILE) > 0:
-            with open(ERRORS_FILE, 'r') as f:
-                lines = f.readlines()
-                error_count = len(lines)
+        # Check for failed pages first
+        if os.path.exists(EVENTS_FILE) and os.path.getsize(EVENTS_FILE) > 0:
+            error_count = len(read_event_pages(EVENT_ERROR))
             
             if error_count > 0:
-                print(f"\n[INFO] Found {error_count} failed pages in '{ERRORS_FILE}'.")
+                print(f"\n[INFO] Found {error_count} failed pages in '{EVENTS_FILE}'.")
                 user_choice = input("Do you want to rescrape these failed pages? (y/n): ").strip().lower()
                 if user_choice == 'y':
                     rescrape_errors = True
         
         # Check for progress file
         if not rescrape_errors and os.path.exists(PROGRESS_FILE) and os.path.getsize(PROGRESS_FILE) > 0:
-            with open(PROGRESS_FILE, 'r') as f:
-                progress_count = sum(1 for line in f if line.strip())
+            progress_count = count_done_pages()
             
             if progress_count > 0:
                 print(f"\n[INFO] Found {progress_count} pages already scraped in '{PROGRESS_FILE}'.")
@@ -483,7 +666,7 @@ def main():
             reset_input = input("Delete existing data and start fresh? (y/n): ").strip().lower()
             reset_db = reset_input == 'y'
             
-            workers_input = input("Enter number of worker threads (default 20): ").strip()
+            workers_input = input("Enter number of concurrent workers (default 20): ").strip()
             max_workers = int(workers_input) if workers_input.isdigit() and int(workers_input) > 0 else 20
             
             limit_pages_input = input("Limit number of pages to scrape (optional, press Enter for all): ").strip()
@@ -520,15 +703,28 @@ def main():
     try:
         conn = get_db_connection()
         init_db(conn, reset=reset_db)
-        conn.close()
+        # bids_stage is a per-session temp table, so create it on the connection the DB worker
+        # will own; failing here aborts the run before any fetch worker can block on the queue
+        cur = conn.cursor()
+        cur.execute(CREATE_BIDS_STAGE)
+        conn.commit()
+        cur.close()
     except Exception as e:
         print(f"[FATAL] Could not connect to DB: {e}")
         return
 
     print("\n[INFO] Starting Parallel Scrape...")
     
+    # Bound the page buffer so fetch workers wait when the DB worker falls behind
+    global data_queue
+    data_queue = queue.Queue(maxsize=max(64, max_workers * 4))
+
+    global http_client
+    http_client = make_http_client(max_workers)
+
     # Start DB Worker Thread
-    consumer_thread = threading.Thread(target=db_worker, daemon=True)
+    # The DB worker keeps the init connection for the whole run instead of reconnecting
+    consumer_thread = threading.Thread(target=db_worker, args=(conn,), daemon=True)
     consumer_thread.start()
     
     # 1. Page Calculation
@@ -536,35 +732,20 @@ def main():
     
     if rescrape_errors:
          try:
-            with open(ERRORS_FILE, 'r') as f:
-                pages_to_fetch = [int(line.strip()) for line in f if line.strip().isdigit()]
-            print(f"[INFO] Loaded {len(pages_to_fetch)} pages from {ERRORS_FILE}.")
-            
-            # Clear the file so we can fill it with NEW errors from this run
-            with open(ERRORS_FILE, 'w') as f:
-                f.truncate(0)
+            # Drop the old error entries so the log only holds NEW errors from this run
+            pages_to_fetch = read_event_pages(EVENT_ERROR, remove=True)
+            print(f"[INFO] Loaded {len(pages_to_fetch)} pages from {EVENTS_FILE}.")
                 
          except Exception as e:
-             print(f"[ERROR] Failed to read errors file: {e}")
+             print(f"[ERROR] Failed to read events file: {e}")
              return
     else:
         # Standard Fetch
         # 1. Fetch first page to get Total Count
-        first_page_url = "https://bidplus.gem.gov.in/all-bids-data"
-        
         # Use first cookie for initial fetch
         init_cookie = COOKIE_POOL[0]
         
-        headers = {
-            "accept": "application/json, text/javascript, */*; q=0.01",
-            "accept-language": "en-US,en;q=0.9",
-            "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "X-Requested-With": "XMLHttpRequest",
-            "origin": "https://bidplus.gem.gov.in",
-            "referer": "https://bidplus.gem.gov.in/all-bids",
-            "cookie": init_cookie["cookie"]
-        }
+        headers = COOKIE_HEADERS[init_cookie["csrf_bd_gem_nk"]]
         
         payload_dict = {
             "param": {"searchBid": search_bid, "searchType": "fullText", "start": 0},
@@ -574,7 +755,7 @@ def main():
                 "sort": "Bid-End-Date-Latest", "byStatus": ""
             }
         }
-        data = {"payload": json.dumps(payload_dict), "csrf_bd_gem_nk": init_cookie["csrf_bd_gem_nk"] }
+        data = {"payload": orjson.dumps(payload_dict).decode(), "csrf_bd_gem_nk": init_cookie["csrf_bd_gem_nk"] }
         
         total_available = 0
         max_init_retries = 3
@@ -582,10 +763,10 @@ def main():
         for attempt in range(max_init_retries):
             try:
                 print(f"[INFO] Fetching initial metadata (Attempt {attempt+1}/{max_init_retries})...")
-                resp = requests.post(first_page_url, headers=headers, data=data, timeout=30)
+                resp = await http_client.post(BIDS_DATA_URL, headers=headers, data=data)
                 resp.raise_for_status()
                 
-                j = resp.json()
+                j = orjson.loads(resp.content)
                 # Validate response structure
                 if "response" not in j or "response" not in j["response"]:
                     raise ValueError("Invalid JSON structure: Missing 'response' key")
@@ -609,7 +790,7 @@ def main():
             except Exception as e:
                 print(f"[WARN] Initial fetch failed: {e}")
                 if attempt < max_init_retries - 1:
-                    time.sleep(2)
+                    await asyncio.sleep(2)
                 else:
                     print("[FATAL] Could not fetch initial data after retries.")
                     return
@@ -635,11 +816,14 @@ def main():
         if resume_from_progress and not rescrape_errors:
              try:
                  if os.path.exists(PROGRESS_FILE):
-                     with open(PROGRESS_FILE, 'r') as f:
-                         done_pages = set(int(line.strip()) for line in f if line.strip().isdigit())
+                     with open(PROGRESS_FILE, 'rb') as f:
+                         done_bits = f.read()
                      
                      initial_count = len(pages_to_fetch)
-                     pages_to_fetch = [p for p in pages_to_fetch if p not in done_pages]
+                     pages_to_fetch = [
+                         p for p in pages_to_fetch
+                         if (p >> 3) >= len(done_bits) or not done_bits[p >> 3] & (1 << (p & 7))
+                     ]
                      print(f"[INFO] Resume: Skipped {initial_count - len(pages_to_fetch)} pages. {len(pages_to_fetch)} remaining.")
              except Exception as e:
                  print(f"[ERROR] Failed to read progress file: {e}")
@@ -649,142 +833,148 @@ def main():
     
     # Create Page Queue
     # Each item: (page_num, retry_count)
-    page_queue = queue.Queue()
+    # Completion is tracked by counting finished pages (saved or dropped) against
+    # the number queued; everything below runs on the one event loop thread.
+    page_queue = asyncio.Queue()
+    pages_left = len(pages_to_fetch)
+    all_pages_done = asyncio.Event()
+    if not pages_to_fetch:
+        all_pages_done.set()
     
     print(f"[INFO] Spawning {max_workers} workers for ~{len(pages_to_fetch)} pages...")
 
     for p in pages_to_fetch:
-        page_queue.put((p, 0)) # page, attempts
-
-    def worker_task(worker_index):
-        # Assign cookie set based on worker index (Round Robin)
-        cookie_set = COOKIE_POOL[worker_index % len(COOKIE_POOL)]
+        page_queue.put_nowait((p, 0)) # page, attempts
+
+    # Failed pages are re-queued by the loop after a delay instead of holding a worker
+    loop = asyncio.get_running_loop()
+    RETRY_DELAY = 1 # seconds
+
+    def finish_page():
+        nonlocal pages_left
+        pages_left -= 1
+        if pages_left == 0:
+            all_pages_done.set()
+
+    global progress_map
+    if pages_to_fetch:
+        progress_map = open_progress_map(max(pages_to_fetch))
+
+    async def worker(worker_index):
+        # Prefer a cookie set based on worker index (Round Robin); fall back to
+        # another one while it is cooling down after a rate limit
+        home_cookie = worker_index % len(COOKIE_POOL)
+        global pages_fetched_counter
         
         while True:
+            page_num, attempt = await page_queue.get()
             try:
-                try:
-                    item = page_queue.get(timeout=3)
-                except queue.Empty:
-                    return # Exit worker if queue is empty for 3s
-                
-                page_num, attempt = item
-                
                 # Try fetching
-                # We reduce internal retries to 1 since we have queue retry
-                success = fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set, retries=1)
+                cookie_set = await acquire_cookie(home_cookie)
+                success = await fetch_bids_page(search_bid, from_date, to_date, page_num, cookie_set)
                 
                 if success:
-                    # Log progress
-                    with progress_file_lock:
-                        try:
-                            with open(PROGRESS_FILE, "a") as f:
-                                f.write(f"{page_num}\n")
-                        except Exception as e:
-                            print(f"[ERROR] Could not write to progress.txt: {e}")
-                    
-                    with pages_fetched_lock:
-                         global pages_fetched_counter
-                         pages_fetched_counter += 1
-
-                    page_queue.task_done()
+                    # Progress is marked by the DB worker once the page's rows are committed
+                    pages_fetched_counter += 1
+                    finish_page()
                 else:
                     if attempt < 3:
                         print(f"[RETRY] Re-queuing Page {page_num} (Attempt {attempt+1})")
-                        time.sleep(1) # Slight pause
-                        page_queue.put((page_num, attempt + 1))
-                        page_queue.task_done() 
+                        loop.call_later(RETRY_DELAY, page_queue.put_nowait, (page_num, attempt + 1))
                     else:
-                        print(f"[FAIL] Dropping Page {page_num} after {attempt} attempts. Saving to errors.txt.")
-                        
-                        # Save to errors.txt
-                        with error_file_lock:
-                            try:
-                                with open(ERRORS_FILE, "a") as f:
-                                    f.write(f"{page_num}\n")
-                            except Exception as e:
-                                print(f"[ERROR] Could not write to errors.txt: {e}")
+                        print(f"[FAIL] Dropping Page {page_num} after {attempt} attempts. Logging to {EVENTS_FILE}.")
+                        log_event(EVENT_ERROR, page_num)
                         
-                        page_queue.task_done()
+                        finish_page()
                         
             except Exception as e:
                 print(f"[FATAL WORKER ERROR] {e}")
 
-    # Start Worker Threads
-    threads = []
-    for i in range(max_workers):
-        t = threading.Thread(target=worker_task, args=(i,), daemon=True)
-        t.start()
-        threads.append(t)
-        
-    # Monitoring Loop
-    
-    # Moving Average Logic
-    history = [] # List of (timestamp, count)
-    WINDOW_SIZE = 10 # seconds
+    async def monitor():
+        # Moving Average Logic
+        # Sliding window of (timestamp, count) samples, oldest first; the rate is the
+        # running delta between the newest sample and the head of the window
+        history = deque()
+        WINDOW_SIZE = 10 # seconds
+        last_shown = None # only rewrite the progress line when it would change
 
-    while True:
-        elapsed_time = time.time() - start_time
-        unfinished = page_queue.unfinished_tasks
-        
-        # Update history for rate calculation
-        now = time.time()
-        with pages_fetched_lock:
+        _time = time.time
+
+        while True:
+            now = _time()
+            elapsed_time = now - start_time
+            unfinished = pages_left
             current_count = pages_fetched_counter
-        
-        history.append((now, current_count))
-        
-        # Prune old history
-        while history and history[0][0] < now - WINDOW_SIZE:
-            history.pop(0)
-            
-        # Calculate instantaneous rate
-        if len(history) > 1:
-            delta_count = history[-1][1] - history[0][1]
-            delta_time = history[-1][0] - history[0][0]
-            if delta_time > 0:
-                rate_pages = delta_count / delta_time
-            else:
-                rate_pages = 0
-        else:
-             # Fallback to global average if not enough history
-             if elapsed_time > 0:
-                 rate_pages = current_count / elapsed_time
-             else:
-                 rate_pages = 0
-
-        if total_fetched >= 0: # Always show
-            # ETA based on pages
-            if rate_pages > 0:
-                eta_s = unfinished / rate_pages
+                
+            history.append((now, current_count))
+            # Prune old history
+            while history[0][0] < now - WINDOW_SIZE:
+                history.popleft()
+
+            # Calculate instantaneous rate
+            window_ts, window_count = history[0]
+            if now > window_ts:
+                rate_pages = (current_count - window_count) / (now - window_ts)
             else:
-                eta_s = 0
-            
-            eta_str = str(time.strftime('%H:%M:%S', time.gmtime(eta_s)))
-            
-            # Display: Rate in Pages/s (or Records/s if preferred, let's do Pages/s as it's cleaner, or both)
-            rec_rate = rate_pages * 10
+                 # Fallback to global average if not enough history
+                 if elapsed_time > 0:
+                     rate_pages = current_count / elapsed_time
+                 else:
+                     rate_pages = 0
+
+            if total_fetched >= 0: # Always show
+                # ETA based on pages
+                if rate_pages > 0:
+                    eta_s = unfinished / rate_pages
+                else:
+                    eta_s = 0
+                
+                # Display: Rate in Pages/s (or Records/s if preferred, let's do Pages/s as it's cleaner, or both)
+                rec_rate = rate_pages * 10
+                
+                shown = (total_fetched, unfinished, round(rec_rate, 1), int(eta_s))
+                if shown != last_shown:
+                    last_shown = shown
+                    eta_m, eta_sec = divmod(int(eta_s), 60)
+                    eta_h, eta_m = divmod(eta_m, 60)
+                    sys.stdout.write(f"\r[PROGRESS] Saved: {total_fetched} | Queue Pending: {unfinished} | Rate: {rec_rate:.1f}/s | ETA: {eta_h:02d}:{eta_m:02d}:{eta_sec:02d}   ")
+                    sys.stdout.flush()
             
-            sys.stdout.write(f"\r[PROGRESS] Saved: {total_fetched} | Queue Pending: {unfinished} | Rate: {rec_rate:.1f}/s | ETA: {eta_str}   ")
-            sys.stdout.flush()
+            if all_pages_done.is_set():
+                 break
+                 
+            # Also check if all workers died?
+            if all(w.done() for w in workers):
+                print("\n[WARN] All workers died unexpectedly.")
+                break
+                
+            # Tick every second, but wake as soon as the last page finishes
+            try:
+                await asyncio.wait_for(all_pages_done.wait(), 1)
+            except asyncio.TimeoutError:
+                pass
+
+    # Start Event Writer Thread and Worker Tasks
+    writer_thread = threading.Thread(target=event_writer, daemon=True)
+    writer_thread.start()
+    workers = [asyncio.create_task(worker(i)) for i in range(max_workers)]
         
-        if page_queue.empty() and unfinished == 0:
-             break
-             
-        # Also check if all threads died?
-        if not any(t.is_alive() for t in threads):
-            print("\n[WARN] All worker threads died unexpectedly.")
-            break
-            
-        time.sleep(1)
+    # Monitoring Loop
+    await monitor()
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
 
-    # Wait for queue logic to flush
-    page_queue.join()
-    
     # Signal DB worker to stop
     done_event.set()
 
     # Wait for consumer to finish writing everything
     data_queue.join()
+    if progress_map is not None:
+        progress_map.flush()
+    event_queue.put(None)
+    writer_thread.join()
+    await http_client.aclose()
     
     # Final check
     elapsed_time = time.time() - start_time
@@ -794,4 +984,4 @@ def main():
         create_backup()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
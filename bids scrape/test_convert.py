@@ -0,0 +1,92 @@
+"""
+Unit tests for convert.py (bid doc -> row -> COPY text line).
+
+Run from this folder:
+    python -m unittest test_convert
+"""
+import unittest
+
+from convert import BID_FIELDS, doc_to_row, row_to_copy_line
+
+
+def make_doc(**overrides):
+    doc = {
+        "id": "101",
+        "b_id": [101],
+        "b_bid_number": ["GEM/2025/B/1"],
+        "b_category_name": ["Chairs"],
+        "b_cat_id": ["cat1"],
+        "b_total_quantity": [5],
+        "b_status": [1],
+        "b_type": [2],
+        "final_start_date_sort": ["2025-12-08T12:27:12Z"],
+        "final_end_date_sort": ["2025-12-30T14:00:00Z"],
+        "bd_category_name": ["Furniture"],
+        "b_eval_type": [0],
+        "ba_official_details_minName": ["Ministry"],
+        "ba_official_details_deptName": ["Dept"],
+    }
+    doc.update(overrides)
+    return doc
+
+
+class DocToRowTest(unittest.TestCase):
+    def test_unwraps_single_element_lists(self):
+        row = doc_to_row(make_doc())
+        self.assertEqual(len(row), len(BID_FIELDS))
+        self.assertEqual(row[0], 101)
+        self.assertEqual(row[1], "GEM/2025/B/1")
+        self.assertEqual(row[4], 5)
+
+    def test_plain_values_are_kept(self):
+        row = doc_to_row(make_doc(b_bid_number="GEM/2025/B/2", b_status=3))
+        self.assertEqual(row[1], "GEM/2025/B/2")
+        self.assertEqual(row[5], 3)
+
+    def test_missing_and_empty_fields_use_defaults(self):
+        doc = make_doc(b_category_name=[], b_type=None)
+        del doc["final_end_date_sort"]
+        row = doc_to_row(doc)
+        self.assertEqual(row[2], "")
+        self.assertEqual(row[6], 0)
+        self.assertIsNone(row[8])
+
+    def test_falls_back_to_int_id_when_b_id_missing(self):
+        doc = make_doc(id="202")
+        del doc["b_id"]
+        self.assertEqual(doc_to_row(doc)[0], 202)
+
+    def test_falls_back_to_int_id_when_b_id_empty(self):
+        self.assertEqual(doc_to_row(make_doc(id="303", b_id=[]))[0], 303)
+
+    def test_non_integer_id_raises(self):
+        doc = make_doc(id="abc")
+        del doc["b_id"]
+        with self.assertRaises(ValueError):
+            doc_to_row(doc)
+
+
+class RowToCopyLineTest(unittest.TestCase):
+    def test_tab_separated_with_newline(self):
+        self.assertEqual(row_to_copy_line((1, "a", 2)), "1\ta\t2\n")
+
+    def test_none_is_null_marker(self):
+        self.assertEqual(row_to_copy_line((1, None, "x")), "1\t\\N\tx\n")
+
+    def test_escapes_backslash_tab_and_newlines(self):
+        line = row_to_copy_line(("a\\b", "c\td", "e\nf", "g\rh"))
+        self.assertEqual(line, "a\\\\b\tc\\td\te\\nf\tg\\rh\n")
+
+    def test_literal_backslash_n_is_not_null(self):
+        self.assertEqual(row_to_copy_line(("\\N",)), "\\\\N\n")
+
+    def test_doc_round_trip_has_one_field_per_column(self):
+        line = row_to_copy_line(doc_to_row(make_doc(b_category_name=["Chairs\tTables"])))
+        self.assertTrue(line.endswith("\n"))
+        fields = line[:-1].split("\t")
+        self.assertEqual(len(fields), len(BID_FIELDS))
+        self.assertEqual(fields[2], "Chairs\\tTables")
+
+
+if __name__ == "__main__":
+    unittest.main()
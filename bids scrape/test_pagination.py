@@ -1,5 +1,7 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 
 url = "https://bidplus.gem.gov.in/all-bids-data"
 headers = {
@@ -11,18 +13,27 @@ headers = {
     "referer": "https://bidplus.gem.gov.in/all-bids"
 }
 
-def get_page(start):
-    payload_dict = {
-        "param": {"searchBid": "", "searchType": "fullText", "start": start},
-        "filter": {
-            "bidStatusType": "bidrastatus", "byType": "all", "highBidValue": "",
-            "byEndDate": {"from": "", "to": ""},
-            "sort": "Bid-End-Date-Latest", "byStatus": ""
-        }
+# One pooled keep-alive session so both page requests share a TLS connection.
+# The search POST is read-only, so it is safe to retry on transient errors.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(
+    total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["POST"])))
+
+# Only "start" changes between requests
+PAYLOAD_TEMPLATE = {
+    "param": {"searchBid": "", "searchType": "fullText", "start": 0},
+    "filter": {
+        "bidStatusType": "bidrastatus", "byType": "all", "highBidValue": "",
+        "byEndDate": {"from": "", "to": ""},
+        "sort": "Bid-End-Date-Latest", "byStatus": ""
     }
-    data = {"payload": json.dumps(payload_dict), "csrf_bd_gem_nk": "8cc1b7dd8d2b7a3bf24c8d202e66efba"}
-    resp = requests.post(url, headers=headers, data=data)
-    j = resp.json()
+}
+
+def get_page(start):
+    PAYLOAD_TEMPLATE["param"]["start"] = start
+    data = {"payload": orjson.dumps(PAYLOAD_TEMPLATE).decode(), "csrf_bd_gem_nk": "8cc1b7dd8d2b7a3bf24c8d202e66efba"}
+    resp = SESSION.post(url, headers=headers, data=data, timeout=(5, 30))
+    j = orjson.loads(resp.content)
     return [d['id'] for d in j['response']['response']['docs']]
 
 ids_0 = get_page(0)
@@ -52,15 +52,11 @@ try:
     
     print(f"Checking {len(bids_to_check)} specific bids...")
     
-    found_count = 0
-    missing_bids = []
-    
-    for bid_num in bids_to_check:
-        cur.execute("SELECT 1 FROM bids WHERE b_bid_number = %s", (bid_num,))
-        if cur.fetchone():
-            found_count += 1
-        else:
-            missing_bids.append(bid_num)
+    # One round trip: psycopg2 sends the list as a Postgres array
+    cur.execute("SELECT b_bid_number FROM bids WHERE b_bid_number = ANY(%s)", (bids_to_check,))
+    found = {row[0] for row in cur.fetchall()}
+    missing_bids = [b for b in bids_to_check if b not in found]
+    found_count = len(bids_to_check) - len(missing_bids)
             
     print(f"\nFound: {found_count}/{len(bids_to_check)}")
     
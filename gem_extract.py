@@ -3,25 +3,34 @@
 gem_extract.py
 
 Usage:
-    python gem_extract.py -t 5
+    python gem_extract.py -t 5 -w 4
 
 Scans pdfs/ recursively, extracts structured contract + item info,
 and writes gem_contracts.xlsx with two sheets: Contracts, Items.
 """
 
 from pathlib import Path
+import os
 import re
+import json
+import hashlib
 import argparse
-from collections import defaultdict
+import heapq
 import difflib
+from itertools import count, repeat
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
+from functools import lru_cache
 import pdfplumber
-import pandas as pd
+from rapidfuzz import process, fuzz
+import xlsxwriter
 from tqdm import tqdm
 
 # ---------- CONFIG ----------
 PDF_DIR = Path("pdfs")
 DATA_EXPORTS_DIR = Path("data_exports")
 OUTPUT_XLSX = DATA_EXPORTS_DIR / "gem_contracts.xlsx"
+TEXT_CACHE_DIR = DATA_EXPORTS_DIR / ".text_cache"  # extracted text/tables keyed by PDF content hash
 
 # Toggle specific extraction blocks
 INCLUDE_ORG_DETAILS = False
@@ -95,14 +104,34 @@ for mapping in (ORG_FIELDS, BUYER_FIELDS, PAYING_FIELDS, SELLER_FIELDS):
     for lbl, col in mapping.items():
         GLOBAL_LABEL_COLUMNS[lbl].append(col)
 CANONICAL_LABELS = list(GLOBAL_LABEL_COLUMNS.keys())
+ALL_TARGET_COLS = {c for cols in GLOBAL_LABEL_COLUMNS.values() for c in cols}
 
 # ---------- regex constants ----------
 CID_RE = re.compile(r"\(cid:\d+\)")
-NON_PRINTABLE_RE = re.compile(r"[\x00-\x08\x0b-\x0c\x0e-\x1f]")
-MULTICOMMA_RE = re.compile(r",\s*,+")
 WHITESPACE_RE = re.compile(r"\s+")
+# Nonprintables (\x00-\x08, \x0b-\x0c, \x0e-\x1f) become spaces via str.translate
+NONPRINTABLE_TO_SPACE = str.maketrans({c: " " for c in [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20)]})
+# One-pass cleaner for flattened text: comma runs (with any spacing/cid between)
+# collapse to "," and whitespace/cid runs to " "
+_SPACE_OR_NOISE = rf"(?:\s|{CID_RE.pattern})"
+CLEAN_RE = re.compile(rf",{_SPACE_OR_NOISE}*,+|{_SPACE_OR_NOISE}+")
+WORD_SPLIT_RE = re.compile(r"(\W+)")
 NONALPHANUM = re.compile(r"[^a-z0-9]")
 DUP_RUN_RE = re.compile(r"(.)\1+")
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097F]+")
+NONWORD_RE = re.compile(r"[^\w]")
+DIGIT_RUN_RE = re.compile(r"\d+")
+LONG_NUMBER_RE = re.compile(r"\b\d{10,}\b")
+NUMBER_SPLIT_RE = re.compile(r"[,\.\s]+")
+NUMBER_TOKEN_RE = re.compile(r"[\d][\d,\.]{0,}")
+CONTRACT_DATE_RE = re.compile(r"\b(\d{1,2}-[A-Za-z]{3}-\d{4})\b")
+TOTAL_ORDER_VALUE_RE = re.compile(r"Total Order Value[^\d]*?([\d][\d,\.]*)", re.IGNORECASE)
+# numeric order row (e.g., "4 pieces 1,810 NA 7,240")
+ORDER_ROW_RE = re.compile(r"^(\d+)\s+([A-Za-z]+)\s+([\d,.,]+)\s+(\S+)\s+([\d,.,]+)")
+SELLER_RE = re.compile(r"\bSeller\b", re.IGNORECASE)
+SELLER_CONTACT_RE = re.compile(r"(?:Contact|Contact No)[\s\w|]*?[:]\s*([+\d\-\s]+)", re.IGNORECASE)
+SELLER_EMAIL_RE = re.compile(r"(?:Email|Email ID)[\s\w|]*?[:]\s*([\w.+\-]+@[\w\-]+(?:\.[\w\-]+)+)", re.IGNORECASE)
+CELL_CONTACT_RE = re.compile(r"(?:Contact|Contact No)[\s\w|.]*?[:]\s*([+\d\-\s,]+)", re.IGNORECASE)
 
 # Reduced label length from 160/120 to 80 to avoid capturing too much preceding text
 PAIR_WITH_PIPE_RE = re.compile(r'(?P<label>[^:\n|]{1,80}\|[^:]{1,80})\s*:\s*(?P<value>.*?)(?=\s[^:\n|]+\|[^:]+:|$)')
@@ -122,18 +151,21 @@ def collapse_duplicate_runs_if_artifact(token: str, min_dup_runs: int = 2, min_d
         return token
     return DUP_RUN_RE.sub(r"\1", token)
 
+def _clean_repl(m) -> str:
+    return "," if m.group()[0] == "," else " "
+
 def preprocess_text(raw: str) -> str:
     """Remove (cid), nonprintables, multiple commas, collapse duplicates conservatively."""
     if not raw:
         return ""
-    t = CID_RE.sub(" ", raw)
-    t = NON_PRINTABLE_RE.sub(" ", t)
-    t = MULTICOMMA_RE.sub(",", t)
-    t = WHITESPACE_RE.sub(" ", t)
+    t = CLEAN_RE.sub(_clean_repl, raw.translate(NONPRINTABLE_TO_SPACE))
     lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
     cleaned_lines = []
     for line in lines:
-        parts = re.split(r"(\W+)", line)  # keep punctuation tokens separate
+        if DUP_RUN_RE.search(line) is None:
+            cleaned_lines.append(line)  # no token can need collapsing
+            continue
+        parts = WORD_SPLIT_RE.split(line)  # keep punctuation tokens separate
         parts = [p if not p.isalpha() else collapse_duplicate_runs_if_artifact(p) for p in parts]
         cleaned_lines.append("".join(parts).strip())
     return "\n".join([ln for ln in cleaned_lines if ln])
@@ -143,14 +175,16 @@ def preprocess_text_preserve_layout(raw: str) -> str:
     if not raw:
         return ""
     # Don't replace whitespace generally, just handle CIDs and non-printables
-    t = CID_RE.sub(" ", raw)
-    t = NON_PRINTABLE_RE.sub(" ", t)
+    t = CID_RE.sub(" ", raw.translate(NONPRINTABLE_TO_SPACE))
     # Don't flatten newlines
     lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
     cleaned_lines = []
     for line in lines:
         # collapse runs?
-        parts = re.split(r"(\W+)", line)
+        if DUP_RUN_RE.search(line) is None:
+            cleaned_lines.append(line)
+            continue
+        parts = WORD_SPLIT_RE.split(line)
         parts = [p if not p.isalpha() else collapse_duplicate_runs_if_artifact(p) for p in parts]
         cleaned_lines.append("".join(parts).strip())
     return "\n".join(cleaned_lines)
@@ -159,11 +193,12 @@ def remove_devanagari_and_noise(s: str) -> str:
     """Strip Devanagari/Hindi characters and cid tokens from values."""
     if s is None:
         return s
-    s = re.sub(r'[\u0900-\u097F]+', ' ', s)
+    s = DEVANAGARI_RE.sub(' ', s)
     s = CID_RE.sub(' ', s)
     s = WHITESPACE_RE.sub(' ', s).strip()
     return s
 
+@lru_cache(maxsize=8192)
 def normalize_label_for_match(s: str) -> str:
     """Create normalized label string for fuzzy matching."""
     if not s:
@@ -180,35 +215,77 @@ def normalize_label_for_match(s: str) -> str:
 
 # precompute normalized canonical labels
 NORM_CANON = {lbl: normalize_label_for_match(lbl) for lbl in CANONICAL_LABELS}
-
-def best_label_match(extracted_label: str, threshold: float = 0.75):
-    nl = normalize_label_for_match(extracted_label)
-    if not nl:
-        return None
-    # exact match
-    for k, nk in NORM_CANON.items():
-        if nl == nk:
-            return k
-    # fuzzy
+NORM_CANON_KEYS = list(NORM_CANON.keys())
+NORM_CANON_LIST = list(NORM_CANON.values())
+NORM_CANON_EXACT = {}
+for lbl, nk in NORM_CANON.items():
+    NORM_CANON_EXACT.setdefault(nk, lbl)
+
+# normalized product label -> item column (first label wins, as in the old scan)
+NORM_PRODUCT_FIELDS = {}
+for lbl, col in PRODUCT_FIELDS.items():
+    NORM_PRODUCT_FIELDS.setdefault(normalize_label_for_match(lbl), col)
+
+# normalized label -> column for each table block parsed by parse_kv_block (later labels win)
+NORM_ORG_FIELDS = {normalize_label_for_match(k): col for k, col in ORG_FIELDS.items()}
+NORM_BUYER_FIELDS = {normalize_label_for_match(k): col for k, col in BUYER_FIELDS.items()}
+NORM_PAYING_FIELDS = {normalize_label_for_match(k): col for k, col in PAYING_FIELDS.items()}
+NORM_SELLER_FIELDS = {normalize_label_for_match(k): col for k, col in SELLER_FIELDS.items()}
+
+def best_fuzzy_index(nl: str, choices: list, threshold: float = 0.75):
+    """Index of the choice with the highest difflib ratio to nl (first wins ties), or None below threshold."""
+    # rapidfuzz's LCS-based ratio is never below difflib's, so its cutoff only drops
+    # choices difflib would reject too; difflib then decides among the few left
+    hits = process.extract(nl, choices, scorer=fuzz.ratio, score_cutoff=threshold * 100, limit=None)
     best = None
     best_ratio = 0.0
-    for k, nk in NORM_CANON.items():
-        ratio = difflib.SequenceMatcher(None, nl, nk).ratio()
+    for idx in sorted(hit[2] for hit in hits):
+        ratio = difflib.SequenceMatcher(None, nl, choices[idx]).ratio()
         if ratio > best_ratio:
             best_ratio = ratio
-            best = k
+            best = idx
     return best if best_ratio >= threshold else None
 
+@lru_cache(maxsize=4096)
+def best_label_match(extracted_label: str, threshold: float = 0.75):
+    nl = normalize_label_for_match(extracted_label)
+    if not nl:
+        return None
+    # exact match needs no scoring
+    exact = NORM_CANON_EXACT.get(nl)
+    if exact:
+        return exact
+    # best fuzzy score over all canonical labels
+    idx = best_fuzzy_index(nl, NORM_CANON_LIST, threshold)
+    return NORM_CANON_KEYS[idx] if idx is not None else None
+
 # ---------- numeric & phone sanitization ----------
 
+class _CharFilter(dict):
+    """str.translate table that decides each code point once with keep(ch) and caches it."""
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def __missing__(self, c):
+        v = self[c] = self.keep(chr(c))
+        return v
+
+# translate() equivalents of re.sub(r'[^\d]', '', s) / re.sub(r'[^\d]', ' ', s)
+DIGITS_ONLY = _CharFilter(lambda ch: ch if ch.isdecimal() else None)
+NONDIGITS_TO_SPACE = _CharFilter(lambda ch: ch if ch.isdecimal() else " ")
+# Devanagari -> space, then keep only [0-9+\-\s,]
+PHONE_CHARS = _CharFilter(lambda ch: " " if "\u0900" <= ch <= "\u097f" else ch if ch in "0123456789+-," or ch.isspace() else None)
+
 def extract_digit_segments(orig: str):
     """Split orig on commas/dots/spaces and return digit-only segments."""
     if not orig:
         return []
-    parts = re.split(r"[,\.\s]+", orig)
-    digits = [re.sub(r"[^\d]", "", p) for p in parts if re.sub(r"[^\d]", "", p)]
+    parts = NUMBER_SPLIT_RE.split(orig)
+    digits = [d for d in (p.translate(DIGITS_ONLY) for p in parts) if d]
     return digits
 
+@lru_cache(maxsize=4096)
 def sanitize_number_string(orig: str, max_reasonable_len: int = MAX_REASONABLE_LEN, tail_digits: int = TAIL_DIGITS):
     """Heuristic to sanitize corrupted numbers and return cleaned digit string (no formatting)."""
     if not orig or not isinstance(orig, str):
@@ -217,7 +294,7 @@ def sanitize_number_string(orig: str, max_reasonable_len: int = MAX_REASONABLE_L
     orig = CID_RE.sub(' ', orig)
     segs = extract_digit_segments(orig)
     if not segs:
-        m = re.findall(r'\d+', orig)
+        m = DIGIT_RUN_RE.findall(orig)
         if not m:
             return None
         segs = m
@@ -245,15 +322,10 @@ def sanitize_double_digits(s: str) -> str:
         return s
     # Check if only digits (or standard floats) - this function expects raw digit string usually
     # But let's be strict: if it looks like a "double artifact", collapse it.
-    
-    is_artifact = True
-    for i in range(0, len(s), 2):
-        if s[i] != s[i+1]:
-            is_artifact = False
-            break
-            
-    if is_artifact:
-        return s[::2]
+    # Even and odd positions match exactly when every pair is doubled (compared in C, no Python loop)
+    half = s[::2]
+    if half == s[1::2]:
+        return half
     return s
 
 def sanitize_phone_string(orig: str):
@@ -262,12 +334,11 @@ def sanitize_phone_string(orig: str):
         return None
     s = orig.strip()
     s = CID_RE.sub(' ', s)
-    s = re.sub(r'[\u0900-\u097F]', ' ', s)
     # keep plus if at start
     plus = ''
     if s.startswith('+'):
         plus = '+'
-    digits = re.sub(r'[^0-9\+\-\s,]', '', s).strip()
+    digits = s.translate(PHONE_CHARS).strip()
     if plus and not digits.startswith('+'):
         digits = '+' + digits
     
@@ -277,21 +348,50 @@ def sanitize_phone_string(orig: str):
 
 # ---------- pdf text extraction ----------
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
+def extract_text_and_tables(pdf_path: Path):
+    """Open the PDF once and return (raw_text, tables) from the same parsed pages."""
     parts = []
+    tables = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
             txt = page.extract_text() or ""
             parts.append(txt)
-    return "\n".join(parts)
-
-def normalize_text_preserve_lines(raw_text: str) -> str:
-    lines = []
-    for line in raw_text.splitlines():
-        ln = re.sub(r'\s+', ' ', line).strip()
-        if ln:
-            lines.append(ln)
-    return "\n".join(lines)
+            try:
+                tables.extend(page.extract_tables())
+            except Exception as e:
+                print(f"  [WARN] Table extraction failed: {e}")
+            # drop the page's parsed layout objects and cached text map (what Page.close() does
+            # in later pdfplumber); pdf.pages keeps every Page alive until the PDF closes
+            page.flush_cache()
+            page.get_textmap.cache_clear()
+    return "\n".join(parts), tables
+
+def load_text_and_tables(pdf_path: Path, use_cache: bool = True):
+    """extract_text_and_tables, reusing an earlier run's result for the same PDF bytes."""
+    if not use_cache:
+        return extract_text_and_tables(pdf_path)
+    digest = hashlib.sha1(pdf_path.read_bytes()).hexdigest()
+    cache_file = TEXT_CACHE_DIR / f"{digest}-{pdfplumber.__version__}.json"
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+        return cached['text'], cached['tables']
+    except (OSError, ValueError, KeyError):
+        pass
+    raw_text, tables = extract_text_and_tables(pdf_path)
+    # the cache is best effort: a failed write must not cost us the text we already have
+    tmp = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # write then rename so a concurrent worker never reads a half-written entry
+        tmp.write_text(json.dumps({'text': raw_text, 'tables': tables}), encoding='utf-8')
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f"  [WARN] Could not write text cache for {pdf_path.name}: {e}")
+        try:
+            tmp.unlink(missing_ok=True)  # drop a partial entry if one was written
+        except OSError:
+            pass
+    return raw_text, tables
 
 # ---------- robust kv extraction (multiple pairs per line) ----------
 
@@ -302,26 +402,36 @@ def parse_global_key_values(text: str) -> dict:
     """
     data = {}
     lines = [ln for ln in text.splitlines() if ln.strip()]
+    has_colon = [':' in ln for ln in lines]
+    extras_by_i = {}
+
+    def continuation(i):
+        # joined text of the colon-free lines after line i (shared by both passes)
+        if i not in extras_by_i:
+            j = i + 1
+            while j < len(lines) and not has_colon[j]:
+                j += 1
+            extras_by_i[i] = " ".join(remove_devanagari_and_noise(ln.strip()) for ln in lines[i + 1:j])
+        return extras_by_i[i]
+
     for i, line in enumerate(lines):
+        # every target column is filled, nothing left to find
+        if len(data) >= len(ALL_TARGET_COLS):
+            break
         # first pipe-based pairs
         for m in PAIR_WITH_PIPE_RE.finditer(line):
             raw_label = m.group('label').strip()
-            eng_label = raw_label.split('|')[-1].strip() if '|' in raw_label else raw_label
-            val = m.group('value').strip()
-            val = remove_devanagari_and_noise(val)
+            eng_label = raw_label.rpartition('|')[2].strip() if '|' in raw_label else raw_label
             matched = best_label_match(eng_label)
             if matched:
                 candidate_cols = GLOBAL_LABEL_COLUMNS.get(matched, [])
                 target_col = next((c for c in candidate_cols if c not in data), None)
                 if target_col:
+                    val = remove_devanagari_and_noise(m.group('value').strip())
                     # gather continuation lines for multiline values
-                    extras = []
-                    j = i + 1
-                    while j < len(lines) and ':' not in lines[j]:
-                        extras.append(remove_devanagari_and_noise(lines[j].strip()))
-                        j += 1
+                    extras = continuation(i)
                     if extras:
-                        val = (val + " " + " ".join(extras)).strip()
+                        val = (val + " " + extras).strip()
                     # phone/number sanitization by column name
                     if 'ContactNo' in target_col or 'Contact' in target_col:
                         val = sanitize_phone_string(val)
@@ -337,20 +447,15 @@ def parse_global_key_values(text: str) -> dict:
             raw_label = m.group('label').strip()
             if '|' in raw_label:
                 continue
-            val = m.group('value').strip()
-            val = remove_devanagari_and_noise(val)
             matched = best_label_match(raw_label)
             if matched:
                 candidate_cols = GLOBAL_LABEL_COLUMNS.get(matched, [])
                 target_col = next((c for c in candidate_cols if c not in data), None)
                 if target_col:
-                    extras = []
-                    j = i + 1
-                    while j < len(lines) and ':' not in lines[j]:
-                        extras.append(remove_devanagari_and_noise(lines[j].strip()))
-                        j += 1
+                    val = remove_devanagari_and_noise(m.group('value').strip())
+                    extras = continuation(i)
                     if extras:
-                        val = (val + " " + " ".join(extras)).strip()
+                        val = (val + " " + extras).strip()
                     if 'ContactNo' in target_col or 'Contact' in target_col:
                         val = sanitize_phone_string(val)
                     elif target_col in ('TotalOrderValueINR',):
@@ -377,28 +482,27 @@ def parse_items(text: str, contract_no: str):
                 items.append(item)
             item_no += 1
             item = {'ContractNo': contract_no, 'ItemNo': item_no}
-            _, val = line.split(':', 1)
+            val = line.partition(':')[2]
             item['ProductName'] = remove_devanagari_and_noise(val.strip())
         elif item is not None and ':' in line:
-            raw_label, val = line.split(':', 1)
-            label = raw_label.split('|')[-1].strip()
+            raw_label, _, val = line.partition(':')
+            label = raw_label.rpartition('|')[2].strip()
             # match against product fields
-            for k, outcol in PRODUCT_FIELDS.items():
-                if normalize_label_for_match(k) == normalize_label_for_match(label):
-                    item[outcol] = remove_devanagari_and_noise(val.strip())
-                    break
+            outcol = NORM_PRODUCT_FIELDS.get(normalize_label_for_match(label))
+            if outcol:
+                item[outcol] = remove_devanagari_and_noise(val.strip())
         elif item is not None:
             # match numeric order row (e.g., "4 pieces 1,810 NA 7,240")
-            m = re.match(r'^(\d+)\s+([A-Za-z]+)\s+([\d,.,]+)\s+(\S+)\s+([\d,.,]+)', line)
+            m = ORDER_ROW_RE.match(line)
             if m:
                 try:
                     item['OrderedQuantity'] = str(int(m.group(1)))
                 except:
                     item['OrderedQuantity'] = sanitize_number_string(m.group(1)) or m.group(1)
                 item['Unit'] = m.group(2)
-                item['UnitPriceINR'] = sanitize_number_string(m.group(3)) or re.sub(r'[^\d]', '', m.group(3))
+                item['UnitPriceINR'] = sanitize_number_string(m.group(3)) or m.group(3).translate(DIGITS_ONLY)
                 item['TaxBifurcationINR'] = m.group(4)
-                item['PriceInclusiveINR'] = sanitize_number_string(m.group(5)) or re.sub(r'[^\d]', '', m.group(5))
+                item['PriceInclusiveINR'] = sanitize_number_string(m.group(5)) or m.group(5).translate(DIGITS_ONLY)
         i += 1
     if item:
         items.append(item)
@@ -413,32 +517,28 @@ def parse_total_order_value(text: str):
         if 'Total Order Value' in line:
             # Try specific partial match first: Label followed by optional space/colon/chars then number
             # The text often looks like: "Total Order Value (in INR) 33,662200"
-            m = re.search(r'Total Order Value[^\d]*?([\d][\d,\.]*)', line, re.IGNORECASE)
+            m = TOTAL_ORDER_VALUE_RE.search(line)
             if m:
                 val_str = m.group(1)
-                digits = re.sub(r'[^\d]', '', val_str)
+                digits = val_str.translate(DIGITS_ONLY)
                 # Sanity check: if it's too short (like '1') or too long, maybe irrelevant.
                 # But usually the immediate next number is the correct one.
                 if len(digits) > 3: 
                     return digits.lstrip('0') or "0"
 
             # Fallback to old logic if regex miss
-            candidates = re.findall(r'[\d][\d,\.]{0,}', line)
-            clean_nums = []
-            for c in candidates:
-                digits = re.sub(r'[^\d]', '', c)
-                if digits:
-                    clean_nums.append(digits)
-            if not clean_nums:
+            # (every token starts with a digit, so each has a non-empty digit string)
+            candidates = NUMBER_TOKEN_RE.findall(line)
+            if not candidates:
                 continue
-            # prefer candidates with commas and reasonable length
-            with_commas = [c for c in candidates if ',' in c and len(re.sub(r'[^\d]', '', c)) <= 12]
-            if with_commas:
-                chosen = re.sub(r'[^\d]', '', with_commas[-1])
-                return chosen.lstrip('0') or "0"
-            short = [c for c in clean_nums if len(c) <= MAX_REASONABLE_LEN]
-            if short:
-                return short[-1].lstrip('0') or "0"
+            clean_nums = [c.translate(DIGITS_ONLY) for c in candidates]
+            # prefer candidates with commas and reasonable length (the last one wins)
+            for c, digits in zip(reversed(candidates), reversed(clean_nums)):
+                if ',' in c and len(digits) <= 12:
+                    return digits.lstrip('0') or "0"
+            for digits in reversed(clean_nums):
+                if len(digits) <= MAX_REASONABLE_LEN:
+                    return digits.lstrip('0') or "0"
             # fallback: take last upto TAIL_DIGITS digits
             last = clean_nums[-1]
             if len(last) > TAIL_DIGITS:
@@ -447,7 +547,7 @@ def parse_total_order_value(text: str):
     return None
 
 def extract_contract_date(text: str):
-    m = re.search(r'\b(\d{1,2}-[A-Za-z]{3}-\d{4})\b', text)
+    m = CONTRACT_DATE_RE.search(text)
     return m.group(1) if m else None
 
 def extract_seller_fields_by_position(text: str) -> dict:
@@ -458,7 +558,7 @@ def extract_seller_fields_by_position(text: str) -> dict:
     data = {}
     # Find "Seller" - usually near the end or distinct section
     # Use case-insensitive search
-    m_seller = re.search(r'\bSeller\b', text, re.IGNORECASE)
+    m_seller = SELLER_RE.search(text)
     if not m_seller:
         return data
 
@@ -468,7 +568,7 @@ def extract_seller_fields_by_position(text: str) -> dict:
     # 1. Look for Contact
     # Find 'Contact' or 'Contact No' followed by digits
     # Use non-greedy match to find the *first* one
-    m_cont = re.search(r'(?:Contact|Contact No)[\s\w|]*?[:]\s*([+\d\-\s]+)', relevant_text, re.IGNORECASE)
+    m_cont = SELLER_CONTACT_RE.search(relevant_text)
     if m_cont:
         val = m_cont.group(1).strip()
         val = sanitize_phone_string(val)
@@ -477,6 +577,7 @@ def extract_seller_fields_by_position(text: str) -> dict:
 
     # 2. Look for Email
     # Find 'Email' or 'Email ID' followed by email-like string
+    m_email = SELLER_EMAIL_RE.search(relevant_text)
     if m_email:
         data['Seller_EmailID'] = m_email.group(1).strip()
         
@@ -486,42 +587,33 @@ def extract_seller_fields_by_position(text: str) -> dict:
 KEY_PIPE_RE = re.compile(r'(?P<label>[^:\n|]{1,80}\|[^:]{1,80})\s*:')
 KEY_GENERIC_RE = re.compile(r'(?P<label>[^:\n]{1,80}?)\s*:')
 
-# Helper to parse a text block with a specific field mapping
-def parse_kv_block(text: str, field_mapping: dict) -> dict:
+# Helper to parse a text block with a specific (pre-normalized) field mapping
+def parse_kv_block(text: str, local_norm_keys: dict) -> dict:
     local_data = {}
     
-    # Pre-calculate normalized keys for this specific block
-    local_norm_keys = {}
-    for k, col in field_mapping.items():
-        local_norm_keys[normalize_label_for_match(k)] = col
+    local_keys_list = list(local_norm_keys.keys())
+    local_cols_list = list(local_norm_keys.values())
 
     # Strategy: Find all candidate KEYS, filter by validity, then extract values between them.
     matches = []
     
     # 1. Find matches
-    # Use finditer for both patterns
-    raw_matches = []
-    for m in KEY_PIPE_RE.finditer(text):
-        raw_matches.append({'m': m, 'type': 'pipe'})
-    for m in KEY_GENERIC_RE.finditer(text):
-        raw_matches.append({'m': m, 'type': 'generic'})
-        
-    # Sort matches by position
-    raw_matches.sort(key=lambda x: x['m'].start())
+    # Each finditer already yields in position order, so merge the two streams
+    # instead of collecting and sorting (ties keep pipe matches first)
+    raw_matches = heapq.merge(KEY_PIPE_RE.finditer(text), KEY_GENERIC_RE.finditer(text), key=re.Match.start)
     
     # Filter matches: Resolve overlaps and check validity
     valid_matches = []
     last_end = 0
     
-    for rm in raw_matches:
-        m = rm['m']
+    for m in raw_matches:
         start, end = m.start(), m.end()
         if start < last_end: continue # Skip overlaps
         
         raw_label = m.group('label')
         # Identify Key
         if '|' in raw_label:
-            eng_label = raw_label.split('|')[-1].strip()
+            eng_label = raw_label.rpartition('|')[2].strip()
         else:
             eng_label = raw_label.strip()
         
@@ -533,15 +625,9 @@ def parse_kv_block(text: str, field_mapping: dict) -> dict:
             matched_col = local_norm_keys[nl]
         else:
             # Fuzzy check
-            best_ratio = 0.0
-            best_col = None
-            for k_norm, col in local_norm_keys.items():
-                 ratio = difflib.SequenceMatcher(None, nl, k_norm).ratio()
-                 if ratio > best_ratio:
-                     best_ratio = ratio
-                     best_col = col
-            if best_col and best_ratio >= 0.75:
-                matched_col = best_col
+            idx = best_fuzzy_index(nl, local_keys_list)
+            if idx is not None:
+                matched_col = local_cols_list[idx]
         
         if matched_col:
             valid_matches.append({
@@ -595,7 +681,7 @@ def parse_kv_block(text: str, field_mapping: dict) -> dict:
              val = sanitize_phone_string(val)
         elif 'GSTIN' in col:
              val = remove_devanagari_and_noise(raw_val)
-             val = re.sub(r'[^\w]', '', val)
+             val = NONWORD_RE.sub('', val)
         else:
              val = remove_devanagari_and_noise(raw_val)
         
@@ -606,101 +692,98 @@ def parse_kv_block(text: str, field_mapping: dict) -> dict:
     return local_data
 
 
-def extract_dict_from_tables(pdf_path: Path) -> dict:
+def extract_dict_from_tables(tables: list) -> dict:
     """
-    Extracts structured data from any detected tables in the PDF.
+    Extracts structured data from the tables detected in the PDF.
     Returns a dict with 'Seller_ContactNo', 'TotalOrderValueINR' etc if found.
     """
     data = {}
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                for table in tables:
-                    for row in table:
-                        # We need to preserve newlines for block parsing
-                        # row_text_list = [str(c) if c else '' for c in row] 
-                        
-                        # Check each cell for blocks
-                        for cell_raw in row:
-                            if not cell_raw: continue
-                            cell_text = str(cell_raw)
-                            
-                            # Preprocess to normalize text BUT preserve structure
-                            # preprocess_text returns lines joined by \n
-                            norm_text = preprocess_text_preserve_layout(cell_text) 
-                            norm_lower = norm_text.lower()
+        for table in tables:
+            for row in table:
+                # We need to preserve newlines for block parsing
+                # row_text_list = [str(c) if c else '' for c in row] 
+                
+                # Check each cell for blocks
+                for cell_raw in row:
+                    if not cell_raw: continue
+                    cell_text = str(cell_raw)
+                    
+                    # Preprocess to normalize text BUT preserve structure
+                    # preprocess_text returns lines joined by \n
+                    norm_text = preprocess_text_preserve_layout(cell_text) 
+                    norm_lower = norm_text.lower()
+                    
+                    # --- SELLER DETAILS BLOCK ---
+                    # 'Seller' might become 'Seler'
+                    if 'details' in norm_lower and ('seller' in norm_lower or 'seler' in norm_lower):
+                        # 1. Parse all standard KV fields using SELLER_FIELDS
+                        block_data = parse_kv_block(norm_text, NORM_SELLER_FIELDS)
+                        data.update(block_data)
+
+                        # 2. ROBUST Contact Logic (User Request) overrides regex parse
+                        # Look for "Contact" in this cell specifically for Mobile extraction
+                        # Use original cell_text for regex to avoid over-cleaning artifacts?
+                        # Actually norm_text is better as it cleans spaces/cids.
+                        m_cont = CELL_CONTACT_RE.search(norm_text)
+                        if m_cont:
+                            raw_nums = m_cont.group(1)
+                            val_sanitized = sanitize_double_digits(raw_nums)
+                            digits_only = val_sanitized.translate(NONDIGITS_TO_SPACE)
+                            nums = LONG_NUMBER_RE.findall(digits_only)
                             
-                            # --- SELLER DETAILS BLOCK ---
-                            # 'Seller' might become 'Seler'
-                            if 'details' in norm_lower and ('seller' in norm_lower or 'seler' in norm_lower):
-                                # 1. Parse all standard KV fields using SELLER_FIELDS
-                                block_data = parse_kv_block(norm_text, SELLER_FIELDS)
-                                data.update(block_data)
-
-                                # 2. ROBUST Contact Logic (User Request) overrides regex parse
-                                # Look for "Contact" in this cell specifically for Mobile extraction
-                                # Use original cell_text for regex to avoid over-cleaning artifacts?
-                                # Actually norm_text is better as it cleans spaces/cids.
-                                m_cont = re.search(r'(?:Contact|Contact No)[\s\w|.]*?[:]\s*([+\d\-\s,]+)', norm_text, re.IGNORECASE)
-                                if m_cont:
-                                    raw_nums = m_cont.group(1)
-                                    val_sanitized = sanitize_double_digits(raw_nums)
-                                    digits_only = re.sub(r'[^\d]', ' ', val_sanitized)
-                                    nums = re.findall(r'\b\d{10,}\b', digits_only)
-                                    
-                                    if nums:
-                                        final_contacts = []
-                                        seen = set()
-                                        for n in nums:
-                                            if n not in seen:
-                                                final_contacts.append(n)
-                                                seen.add(n)
-                                        data['Seller_ContactNo'] = ", ".join(final_contacts)
-
-                            # --- BUYER DETAILS BLOCK ---
-                            elif 'details' in norm_lower and 'buyer' in norm_lower:
-                                block_data = parse_kv_block(norm_text, BUYER_FIELDS)
-                                data.update(block_data)
-
-                            # --- PAYING DETAILS BLOCK ---
-                            elif 'paying' in norm_lower and ('authority' in norm_lower or 'detail' in norm_lower):
-                                if INCLUDE_PAYING_DETAILS:
-                                    block_data = parse_kv_block(norm_text, PAYING_FIELDS)
-                                    data.update(block_data)
-
-                            # --- ORG DETAILS BLOCK ---
-                            elif 'organisation' in norm_lower and 'details' in norm_lower:
-                                if INCLUDE_ORG_DETAILS:
-                                    block_data = parse_kv_block(norm_text, ORG_FIELDS)
-                                    data.update(block_data)
-                        # Check row for Total Order Value
-                        # For TOV, we can flatten to single line for search
-                        row_flat = [str(c).replace('\n', ' ').strip() if c else '' for c in row]
-                        found_tov = False
-                        for cell_text in row_flat:
-                            if 'total order value' in cell_text.lower():
-                                found_tov = True
-                                break
+                            if nums:
+                                final_contacts = []
+                                seen = set()
+                                for n in nums:
+                                    if n not in seen:
+                                        final_contacts.append(n)
+                                        seen.add(n)
+                                data['Seller_ContactNo'] = ", ".join(final_contacts)
+
+                    # --- BUYER DETAILS BLOCK ---
+                    elif 'details' in norm_lower and 'buyer' in norm_lower:
+                        block_data = parse_kv_block(norm_text, NORM_BUYER_FIELDS)
+                        data.update(block_data)
+
+                    # --- PAYING DETAILS BLOCK ---
+                    elif 'paying' in norm_lower and ('authority' in norm_lower or 'detail' in norm_lower):
+                        if INCLUDE_PAYING_DETAILS:
+                            block_data = parse_kv_block(norm_text, NORM_PAYING_FIELDS)
+                            data.update(block_data)
+
+                    # --- ORG DETAILS BLOCK ---
+                    elif 'organisation' in norm_lower and 'details' in norm_lower:
+                        if INCLUDE_ORG_DETAILS:
+                            block_data = parse_kv_block(norm_text, NORM_ORG_FIELDS)
+                            data.update(block_data)
+                # Check row for Total Order Value
+                # For TOV, we can flatten to single line for search
+                row_flat = [str(c).replace('\n', ' ').strip() if c else '' for c in row]
+                found_tov = False
+                for cell_text in row_flat:
+                    if 'total order value' in cell_text.lower():
+                        found_tov = True
+                        break
+                
+                if found_tov:
+                    # Look for the number in the SAME ROW (other cells)
+                    candidates = []
+                    for other in row_flat:
+                        if 'total order value' in other.lower(): continue
+                        if not other.strip(): continue
                         
-                        if found_tov:
-                            # Look for the number in the SAME ROW (other cells)
-                            candidates = []
-                            for other in row_flat:
-                                if 'total order value' in other.lower(): continue
-                                if not other.strip(): continue
-                                
-                                s = sanitize_double_digits(other)
-                                d = re.sub(r'[^\d]', '', s)
-                                if len(d) > 2: 
-                                    candidates.append(s)
-                            
-                            if candidates:
-                                val = candidates[-1]
-                                val = re.sub(r'[^\d]', '', val)
-                                val = val.lstrip('0') or "0"
-                                data['TotalOrderValueINR'] = val
-                            
+                        s = sanitize_double_digits(other)
+                        d = s.translate(DIGITS_ONLY)
+                        if len(d) > 2: 
+                            candidates.append(s)
+                    
+                    if candidates:
+                        val = candidates[-1]
+                        val = val.translate(DIGITS_ONLY)
+                        val = val.lstrip('0') or "0"
+                        data['TotalOrderValueINR'] = val
+                    
     except Exception as e:
         print(f"  [WARN] Table extraction failed: {e}")
         
@@ -708,14 +791,15 @@ def extract_dict_from_tables(pdf_path: Path) -> dict:
 
 # ---------- per-pdf processing ----------
 
-def process_pdf(pdf_path: Path, debug_first: bool = False):
+def process_pdf(pdf_path: Path, debug_first: bool = False, use_cache: bool = True):
     # print(f'\n=== Processing {pdf_path.name} ===')
-    raw_text = extract_text_from_pdf(pdf_path)
+    # Parse the PDF once; text and tables come from the same pages
+    raw_text, tables = load_text_and_tables(pdf_path, use_cache)
     if not raw_text.strip():
         # tqdm.write('  WARNING: no text extracted by pdfplumber')
         pass
-    text = normalize_text_preserve_lines(raw_text)
-    text = preprocess_text(text)
+    # preprocess_text collapses every whitespace run itself, so raw text goes straight in
+    text = preprocess_text(raw_text)
     if debug_first:
         dbg = pdf_path.with_suffix('.normalized.txt')
         dbg.write_text(text, encoding='utf-8')
@@ -730,7 +814,7 @@ def process_pdf(pdf_path: Path, debug_first: bool = False):
     
     # --- Positional Override for Seller/Buyer Details ---
     # 1. Table extraction (Highest Priority)
-    table_data = extract_dict_from_tables(pdf_path)
+    table_data = extract_dict_from_tables(tables)
     # Merge all table extracted data (overrides global parse)
     row.update(table_data)
     
@@ -752,11 +836,41 @@ def process_pdf(pdf_path: Path, debug_first: bool = False):
     # print(f"  Fields extracted (Org+Buyer+Paying+Seller): {len(kv)}, Items: {len(items)}")
     return row, items
 
+def process_pdf_safe(pdf_path: Path, debug_first: bool = False, use_cache: bool = True):
+    """process_pdf for pool workers: returns (row, items, error) instead of raising."""
+    try:
+        row, items = process_pdf(pdf_path, debug_first=debug_first, use_cache=use_cache)
+        return row, items, None
+    except Exception as e:
+        return None, None, str(e)
+
 # ---------- Main entry + Excel writing ----------
 
+def sheet_writer(workbook, name, columns, text_cols, header_fmt, text_fmt):
+    """Add a sheet with its header; return a function that appends one dict as the next row."""
+    ws = workbook.add_worksheet(name)
+    for col, width in text_cols.items():
+        if col in columns:
+            idx = columns.index(col)
+            ws.set_column(idx, idx, width, text_fmt)
+    ws.write_row(0, 0, columns, header_fmt)
+    text_idx = [c for c, col in enumerate(columns) if col in text_cols]
+    row_nums = count(1)
+
+    def write(row):
+        # write_row leaves None/'' cells blank, same as skipping them
+        values = [row.get(col) for col in columns]
+        for c in text_idx:
+            if values[c] is not None:
+                values[c] = str(values[c])
+        ws.write_row(next(row_nums), 0, values)
+    return write
+
 def main():
     parser = argparse.ArgumentParser(description='Extract GeM contract PDFs into Excel.')
     parser.add_argument('-t', '--test', type=int, help='process first N PDFs (test mode).')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='worker processes (default: CPU count).')
+    parser.add_argument('--no-cache', action='store_true', help=f're-parse every PDF instead of reusing text cached in {TEXT_CACHE_DIR}.')
     args = parser.parse_args()
 
     all_pdfs = sorted(PDF_DIR.rglob('*.pdf'))
@@ -766,28 +880,6 @@ def main():
     pdf_files = all_pdfs[:args.test] if args.test else all_pdfs
     print(f'Found {len(all_pdfs)} PDFs, processing {len(pdf_files)} now.')
 
-    contracts = []
-    items = []
-    
-    # Use tqdm for progress bar
-    print(f'Starting extraction for {len(pdf_files)} files...')
-    pbar = tqdm(pdf_files, unit="file")
-    for idx, pdf in enumerate(pbar):
-        pbar.set_description(f"Extracting {pdf.name[:30]}")
-        try:
-            # Only debug first file if test mode is not on, or just first file generally
-            debug_mode = (idx == 0)
-            row, item_rows = process_pdf(pdf, debug_first=debug_mode)
-            contracts.append(row)
-            items.extend(item_rows)
-        except Exception as e:
-            tqdm.write(f'ERROR processing {pdf.name}: {e}')
-
-
-
-    df_contracts = pd.DataFrame(contracts)
-    df_items = pd.DataFrame(items)
-
     # Ensure required columns exist and in correct order
     required_contract_cols = [
         'ContractNo','GeneratedDate',
@@ -802,59 +894,57 @@ def main():
 
     if INCLUDE_PAYING_DETAILS:
         required_contract_cols.extend(['Paying_Role','Paying_PaymentMode','Paying_Designation','Paying_EmailID','Paying_GSTIN','Paying_Address'])
-    for c in required_contract_cols:
-        if c not in df_contracts.columns:
-            df_contracts[c] = pd.NA
-    df_contracts = df_contracts[required_contract_cols]
 
     required_item_cols = ['ContractNo','ItemNo','ProductName','Brand','BrandType','CatalogueStatus','SellingAs',
                           'CategoryNameQuadrant','Model','HSNCode','OrderedQuantity','Unit','UnitPriceINR',
                           'TaxBifurcationINR','PriceInclusiveINR']
-    for c in required_item_cols:
-        if c not in df_items.columns:
-            df_items[c] = pd.NA
-    df_items = df_items[required_item_cols]
-
-    # Convert numeric/special columns to strings so Excel won't use scientific notation
-    df_contracts['TotalOrderValueINR'] = df_contracts['TotalOrderValueINR'].astype(str).fillna('')
-    for col in ['Buyer_ContactNo','Paying_ContactNo','Seller_ContactNo']:
-        if col in df_contracts.columns:
-            df_contracts[col] = df_contracts[col].astype(str).fillna('')
-
-    for col in ['UnitPriceINR','PriceInclusiveINR','OrderedQuantity']:
-        if col in df_items.columns:
-            df_items[col] = df_items[col].astype(str).fillna('')
-
-    # Write Excel with text formatting for those columns
-    print(f"DONE. Excel at {OUTPUT_XLSX}")
+
+    # Numeric/special columns are written as text so Excel won't use scientific notation
+    contract_text_cols = {'TotalOrderValueINR': 20, 'Buyer_ContactNo': 18, 'Paying_ContactNo': 18, 'Seller_ContactNo': 18}
+    item_text_cols = {'UnitPriceINR': 18, 'PriceInclusiveINR': 18, 'OrderedQuantity': 18}
+
     # Ensure dir
     OUTPUT_XLSX.parent.mkdir(parents=True, exist_ok=True)
-    with pd.ExcelWriter(OUTPUT_XLSX) as writer:
-        df_contracts.to_excel(writer, sheet_name='Contracts', index=False)
-        df_items.to_excel(writer, sheet_name='Items', index=False)
-        workbook = writer.book
-        text_fmt = workbook.add_format({'num_format': '@'})  # text format
-
-        # Set Contracts TotalOrderValueINR as text column
-        ws_contracts = writer.sheets['Contracts']
-        col_idx = df_contracts.columns.get_loc('TotalOrderValueINR')
-        ws_contracts.set_column(col_idx, col_idx, 20, text_fmt)
-
-        # Make phone columns text (if present)
-        for col in ['Buyer_ContactNo','Paying_ContactNo','Seller_ContactNo']:
-            if col in df_contracts.columns:
-                idx = df_contracts.columns.get_loc(col)
-                ws_contracts.set_column(idx, idx, 18, text_fmt)
-
-        # Items: set string columns for numeric fields
-        ws_items = writer.sheets['Items']
-        for col in ['UnitPriceINR','PriceInclusiveINR','OrderedQuantity']:
-            if col in df_items.columns:
-                idx = df_items.columns.get_loc(col)
-                ws_items.set_column(idx, idx, 18, text_fmt)
+    # Rows go into the sheets as each PDF finishes, so no contract/item lists are held;
+    # constant_memory flushes each row as it is written.
+    # Values are plain data, so skip write()'s formula/URL/number sniffing on every string.
+    workbook = xlsxwriter.Workbook(OUTPUT_XLSX, {
+        'constant_memory': True,
+        'strings_to_numbers': False,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    text_fmt = workbook.add_format({'num_format': '@'})  # text format
+    write_contract = sheet_writer(workbook, 'Contracts', required_contract_cols, contract_text_cols, header_fmt, text_fmt)
+    write_item = sheet_writer(workbook, 'Items', required_item_cols, item_text_cols, header_fmt, text_fmt)
+    n_contracts = 0
+    n_items = 0
+    
+    # PDFs are independent, so parse them in worker processes (pdfminer holds the GIL);
+    # map() keeps results in file order. Use tqdm for progress bar
+    print(f'Starting extraction for {len(pdf_files)} files with {args.workers} workers...')
+    # Only debug first file
+    debug_flags = [idx == 0 for idx in range(len(pdf_files))]
+    with ProcessPoolExecutor(max_workers=args.workers) as ex:
+        results = ex.map(process_pdf_safe, pdf_files, debug_flags, repeat(not args.no_cache), chunksize=4)
+        pbar = tqdm(zip(pdf_files, results), total=len(pdf_files), unit="file")
+        for pdf, (row, item_rows, err) in pbar:
+            pbar.set_description(f"Extracted {pdf.name[:30]}")
+            if err is not None:
+                tqdm.write(f'ERROR processing {pdf.name}: {err}')
+                continue
+            write_contract(row)
+            n_contracts += 1
+            for item in item_rows:
+                write_item(item)
+            n_items += len(item_rows)
+
+    print(f"DONE. Excel at {OUTPUT_XLSX}")
+    workbook.close()
 
     print('DONE. Excel at', OUTPUT_XLSX.resolve())
-    print(f'Contracts rows: {len(df_contracts)}, Items rows: {len(df_items)}')
+    print(f'Contracts rows: {n_contracts}, Items rows: {n_items}')
 
 if __name__ == '__main__':
     main()